@@ -1,8 +1,257 @@
 import os
+import re
 import json
-import requests
+import time
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+import httpx
+import orjson
 import google.generativeai as genai
 
+def _env(name: str) -> str:
+    """Read an environment variable as a stripped string ('' if unset)"""
+    return os.environ.get(name, "").strip()
+
+# Shared async HTTP client for WbizTool API calls
+# A single AsyncClient gives keep-alive connection pooling (no TCP+TLS
+# handshake per send) and, unlike requests.post, doesn't block the event
+# loop while the WbizTool round trip is in flight.
+# Module-level (not per-instance) because AgenticService is constructed
+# fresh for every task, which would defeat connection reuse.
+_ASYNC_CLIENT = None
+
+def get_async_client():
+    """
+    Get the shared httpx.AsyncClient used for WbizTool API calls
+    (lazily created so it binds to the running event loop; exposed so
+    tests can swap in their own client)
+    """
+    global _ASYNC_CLIENT
+    if _ASYNC_CLIENT is None or _ASYNC_CLIENT.is_closed:
+        # Split connect/read timeouts so dead peers fail fast instead of
+        # hanging for a single 30s budget; the transport retries connection
+        # failures on its own before they surface as errors
+        _ASYNC_CLIENT = httpx.AsyncClient(
+            timeout=httpx.Timeout(10.0, connect=3.0),
+            limits=httpx.Limits(max_keepalive_connections=20),
+            transport=httpx.AsyncHTTPTransport(retries=3)
+        )
+    return _ASYNC_CLIENT
+
+# Whether the one-time connection warm-up has already been kicked off
+# (module-level so per-task AgenticService instances don't re-warm)
+_WARMED_UP = False
+
+# Transient WbizTool failures (gateway errors) are retried on the pooled
+# keep-alive connection with exponential backoff before giving up
+_RETRY_STATUS_CODES = (502, 503, 504)
+_RETRY_TOTAL = 3
+_RETRY_BACKOFF_SECONDS = 0.3
+
+async def close_async_client():
+    """Close the shared httpx.AsyncClient (call from the app shutdown hook)"""
+    global _ASYNC_CLIENT
+    if _ASYNC_CLIENT is not None and not _ASYNC_CLIENT.is_closed:
+        await _ASYNC_CLIENT.aclose()
+    _ASYNC_CLIENT = None
+
+# Fixed formatting instruction, passed as the model's system instruction so
+# the stable prefix stays identical (and first) on every call - this lets
+# Gemini's implicit context caching reuse the encoded prefix across requests
+# Reference: https://ai.google.dev/gemini-api/docs/caching
+_FORMAT_INSTRUCTION = (
+    "Format the following content in a clear, professional, and "
+    "well-structured way. Make it easy to read and understand."
+)
+
+# Maximum length WhatsApp accepts for a text message body - content longer
+# than this would fail the downstream send, so it's rejected before paying
+# for a Gemini call
+MAX_WHATSAPP_LEN = 65536
+
+# Short OTP / verification-code style messages (e.g. "A1B2-C3D4") that
+# formatting would only mangle
+_CODE_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9 \-]{2,18}$")
+
+# Exact-match cache for Gemini formatting results
+# Repeated or templated content skips the Gemini round trip entirely.
+# LRU eviction bounds memory; the TTL keeps entries from going stale.
+# Module-level so cache hits survive the per-task AgenticService instances.
+_FORMAT_CACHE_MAX_ENTRIES = 1024
+_FORMAT_CACHE_TTL_SECONDS = 3600
+_FORMAT_CACHE = OrderedDict()  # content digest -> (expires_at, formatted_text)
+
+def _format_cache_key(content: str) -> str:
+    """Compute the cache key for a piece of content"""
+    return hashlib.blake2b(content.encode(), digest_size=16).hexdigest()
+
+def _format_cache_get(key: str):
+    """Look up a cached formatting result, or None on miss/expiry"""
+    entry = _FORMAT_CACHE.get(key)
+    if entry is None:
+        return None
+    expires_at, formatted_text = entry
+    if expires_at < time.monotonic():
+        del _FORMAT_CACHE[key]
+        return None
+    _FORMAT_CACHE.move_to_end(key)
+    return formatted_text
+
+def _format_cache_put(key: str, formatted_text: str):
+    """Store a formatting result, evicting the least recently used entries"""
+    _FORMAT_CACHE[key] = (time.monotonic() + _FORMAT_CACHE_TTL_SECONDS, formatted_text)
+    _FORMAT_CACHE.move_to_end(key)
+    while len(_FORMAT_CACHE) > _FORMAT_CACHE_MAX_ENTRIES:
+        _FORMAT_CACHE.popitem(last=False)
+
+class _FormatBatcher:
+    """
+    Coalesces concurrent Gemini formatting requests into a single call
+
+    Requests arriving within a short window are combined into one prompt
+    asking Gemini to format each item independently and return a JSON
+    array, amortizing per-call HTTP and model overhead. Single requests
+    go through unbatched; if the batched response can't be parsed, each
+    item falls back to its own call.
+    """
+    MAX_BATCH_SIZE = 8
+    MAX_WAIT_SECONDS = 0.025
+
+    def __init__(self, model):
+        self._model = model
+        self._queue = asyncio.Queue()
+        self._consumer = None
+
+    async def format(self, content: str) -> str:
+        """Enqueue content for formatting and await its result"""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((content, future))
+        if self._consumer is None or self._consumer.done():
+            self._consumer = asyncio.create_task(self._consume())
+        return await future
+
+    async def _consume(self):
+        """Drain the queue in small batches until it stays empty"""
+        while True:
+            try:
+                item = await asyncio.wait_for(self._queue.get(), timeout=1.0)
+            except asyncio.TimeoutError:
+                # Queue has gone quiet - but a producer may have enqueued an
+                # item in this same loop iteration while observing this task
+                # as not yet done (so it won't respawn a consumer). Re-check
+                # before exiting; no await sits between the check and the
+                # return, so an item can't slip through.
+                if not self._queue.empty():
+                    continue
+                return
+            batch = [item]
+            deadline = asyncio.get_running_loop().time() + self.MAX_WAIT_SECONDS
+            while len(batch) < self.MAX_BATCH_SIZE:
+                remaining = deadline - asyncio.get_running_loop().time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+                except asyncio.TimeoutError:
+                    break
+            await self._run_batch(batch)
+
+    async def _run_batch(self, batch):
+        """Issue one Gemini call for the batch and distribute the results"""
+        if len(batch) == 1:
+            content, future = batch[0]
+            await self._format_single(content, future)
+            return
+
+        numbered = "\n".join(f"{i + 1}. {content}" for i, (content, _) in enumerate(batch))
+        prompt = (
+            f"Format each of the following {len(batch)} items independently. "
+            f"Return ONLY a JSON array of {len(batch)} strings, one formatted "
+            f"result per item, in the same order:\n\n{numbered}"
+        )
+        try:
+            response = await self._model.generate_content_async(prompt)
+            results = self._parse_batch_response(response.text, len(batch))
+        except Exception:
+            # Batched call or parse failed; retry each item on its own
+            for content, future in batch:
+                await self._format_single(content, future)
+            return
+        for (_, future), formatted_text in zip(batch, results):
+            if not future.done():
+                future.set_result(formatted_text)
+
+    async def _format_single(self, content: str, future):
+        """Format one item with a plain (unbatched) Gemini call"""
+        try:
+            response = await self._model.generate_content_async(content)
+            if not future.done():
+                future.set_result(response.text)
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+
+    @staticmethod
+    def _parse_batch_response(text: str, expected: int) -> list:
+        """Parse the JSON array from a batched response (handles code fences)"""
+        cleaned = text.strip()
+        if cleaned.startswith("```"):
+            cleaned = cleaned.split("\n", 1)[1] if "\n" in cleaned else ""
+            cleaned = cleaned.rstrip()
+            if cleaned.endswith("```"):
+                cleaned = cleaned[:-3]
+        results = json.loads(cleaned)
+        if not isinstance(results, list) or len(results) != expected or \
+                not all(isinstance(r, str) for r in results):
+            raise ValueError(f"Expected a JSON array of {expected} strings")
+        return results
+
+# Known dial-code prefixes for country-code extraction, grouped so the
+# longest prefix wins (standard ITU dial-code disambiguation). Built once
+# at import so extraction is a couple of dict lookups instead of a chain
+# of startswith() scans.
+_COUNTRY_CODES = frozenset((
+    # 1-digit codes
+    "1", "7",
+    # 2-digit codes
+    "31", "32", "33", "34", "39", "41", "43", "44", "45", "46", "47", "48", "49", "91",
+    # 3-digit codes
+    "880", "961", "962", "965", "966", "968", "971", "974",
+))
+
+# Translation table that strips phone-number punctuation in one C-level pass
+_PHONE_STRIP_TABLE = str.maketrans("", "", " -()")
+
+# Delete table that keeps only ASCII digits, used with bytes.translate to
+# extract the digit string in a single C-level pass
+_NON_DIGIT_BYTES = bytes(i for i in range(256) if not 0x30 <= i <= 0x39)
+
+# In-flight task dedupe: concurrent tasks for the same (receiver, content)
+# pair collapse into one Gemini call and one WbizTool POST, with the
+# followers awaiting the leader's result. Entries are removed as soon as
+# the leader finishes, so the dict stays bounded by current concurrency.
+# Module-level so per-task AgenticService instances share it.
+_INFLIGHT_TASKS = {}  # task digest -> asyncio.Future of (formatted_content, sent)
+
+def _inflight_key(receiver: str, content: str) -> str:
+    """Compute the dedupe key for a (receiver, content) pair"""
+    return hashlib.blake2b((receiver + "\x00" + content).encode(), digest_size=16).hexdigest()
+
+# Shared batcher instance - module-level so concurrent tasks (each with
+# their own AgenticService) can actually coalesce into one Gemini call
+_FORMAT_BATCHER = None
+
+def _get_format_batcher(model) -> _FormatBatcher:
+    """Get the shared _FormatBatcher, creating it on first use"""
+    global _FORMAT_BATCHER
+    if _FORMAT_BATCHER is None:
+        _FORMAT_BATCHER = _FormatBatcher(model)
+    return _FORMAT_BATCHER
+
 class ServiceResult:
     """Result object for WhatsApp agent service"""
     def __init__(self, receiver: str, original_content: str, formatted_content: str, sent: bool):
@@ -27,9 +276,8 @@ class AgenticService:
         # Initialize Gemini API client
         # The client automatically gets the API key from the environment variable GEMINI_API_KEY
         # Reference: https://ai.google.dev/gemini-api/docs/quickstart
-        # Check both os.getenv and os.environ (common pattern from GitHub projects)
-        gemini_api_key = os.getenv("GEMINI_API_KEY") or os.environ.get("GEMINI_API_KEY", "")
-        if not gemini_api_key or not gemini_api_key.strip():
+        gemini_api_key = _env("GEMINI_API_KEY")
+        if not gemini_api_key:
             if self.logger:
                 self.logger.error("GEMINI_API_KEY environment variable is not set")
             raise ValueError("GEMINI_API_KEY environment variable is required")
@@ -37,14 +285,43 @@ class AgenticService:
         # Configure the Gemini API
         # Reference: https://ai.google.dev/gemini-api/docs/quickstart
         genai.configure(api_key=gemini_api_key)
+
+        # Reuse a single GenerativeModel (and its underlying HTTP client)
+        # across calls instead of reconstructing it on every format request.
+        # The fixed formatting instruction rides along as the system
+        # instruction so per-call prompts contain only the user content.
+        self._gemini_model = genai.GenerativeModel(
+            "gemini-2.5-flash",
+            system_instruction=_FORMAT_INSTRUCTION
+        )
         
         # WbizTool API configuration
         # Reference: https://wbiztool.com/docs/
         # Required fields: client_id, api_key, whatsapp_client
-        self.wbiztool_client_id = (os.getenv("WBIZTOOL_CLIENT_ID") or os.environ.get("WBIZTOOL_CLIENT_ID", "")).strip()
-        self.wbiztool_api_key = (os.getenv("WBIZTOOL_API_KEY") or os.environ.get("WBIZTOOL_API_KEY", "")).strip()
-        self.wbiztool_whatsapp_client = (os.getenv("WBIZTOOL_WHATSAPP_CLIENT") or os.environ.get("WBIZTOOL_WHATSAPP_CLIENT", "")).strip()
-        
+        self.wbiztool_client_id = _env("WBIZTOOL_CLIENT_ID")
+        self.wbiztool_api_key = _env("WBIZTOOL_API_KEY")
+        self.wbiztool_whatsapp_client = _env("WBIZTOOL_WHATSAPP_CLIENT")
+
+        # Coerce the numeric credentials once instead of re-parsing them on
+        # every send; None means unset or not a number (checked at send time)
+        try:
+            self._wbiztool_client_id_int = int(self.wbiztool_client_id) if self.wbiztool_client_id else None
+            self._wbiztool_whatsapp_client_int = int(self.wbiztool_whatsapp_client) if self.wbiztool_whatsapp_client else None
+        except ValueError:
+            if self.logger:
+                self.logger.error("WbizTool client_id/whatsapp_client must be numeric")
+            self._wbiztool_client_id_int = None
+            self._wbiztool_whatsapp_client_int = None
+
+        # Reusable payload template - per-send payloads are a .copy() plus
+        # the phone, country_code and msg fields
+        self._payload_template = {
+            "client_id": self._wbiztool_client_id_int,
+            "api_key": self.wbiztool_api_key,
+            "whatsapp_client": self._wbiztool_whatsapp_client_int,
+            "msg_type": 0  # 0 for text message
+        }
+
         # WbizTool API endpoint
         self.wbiztool_api_url = "https://wbiztool.com/api/v1/send_msg/"
         
@@ -53,47 +330,131 @@ class AgenticService:
             if not self.wbiztool_client_id:
                 self.logger.warning("WBIZTOOL_CLIENT_ID is not set or is empty")
             else:
-                self.logger.debug(f"WBIZTOOL_CLIENT_ID is set: {self.wbiztool_client_id}")
+                self.logger.debug("WBIZTOOL_CLIENT_ID is set: %s", self.wbiztool_client_id)
             
             if not self.wbiztool_api_key:
                 self.logger.warning("WBIZTOOL_API_KEY is not set or is empty")
             else:
-                self.logger.debug(f"WBIZTOOL_API_KEY is set (length: {len(self.wbiztool_api_key)})")
+                self.logger.debug("WBIZTOOL_API_KEY is set (length: %d)", len(self.wbiztool_api_key))
             
             if not self.wbiztool_whatsapp_client:
                 self.logger.warning("WBIZTOOL_WHATSAPP_CLIENT is not set or is empty")
             else:
-                self.logger.debug(f"WBIZTOOL_WHATSAPP_CLIENT is set: {self.wbiztool_whatsapp_client}")
-    
+                self.logger.debug("WBIZTOOL_WHATSAPP_CLIENT is set: %s", self.wbiztool_whatsapp_client)
+
+        # Warm the DNS cache and TLS connections to both upstreams so the
+        # first real request doesn't pay the full handshake cost
+        self._warmup()
+
+    def _warmup(self):
+        """
+        Kick off a one-time background warm-up of the WbizTool and Gemini
+        connections (DNS resolution + TCP/TLS handshake)
+
+        Runs as an asyncio task when an event loop is available so the
+        WbizTool connection lands in the shared client's keep-alive pool,
+        otherwise as a daemon thread. Failures are swallowed - warm-up must
+        never block or break startup.
+        """
+        global _WARMED_UP
+        if _WARMED_UP:
+            return
+        _WARMED_UP = True
+
+        async def _warm_async():
+            try:
+                await get_async_client().head("https://wbiztool.com/")
+            except Exception:
+                pass
+            try:
+                await asyncio.to_thread(self._gemini_model.count_tokens, "x")
+            except Exception:
+                pass
+
+        def _warm_thread():
+            try:
+                httpx.head("https://wbiztool.com/", timeout=5.0)
+            except Exception:
+                pass
+            try:
+                self._gemini_model.count_tokens("x")
+            except Exception:
+                pass
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            threading.Thread(target=_warm_thread, name="agent-warmup", daemon=True).start()
+        else:
+            loop.create_task(_warm_async())
+
+    def _should_skip_format(self, content: str) -> bool:
+        """
+        Decide whether content is trivial enough to skip Gemini formatting
+
+        Very short messages, single short lines that are already tidy, and
+        OTP/verification-code style strings gain nothing from formatting,
+        so the Gemini round trip can be eliminated for them entirely.
+
+        Args:
+            content: Original content to check
+
+        Returns:
+            True if the content should be sent as-is without formatting
+        """
+        if len(content) < 20:
+            return True
+        if "\n" not in content and len(content) < 160 and content == content.strip():
+            return True
+        if _CODE_PATTERN.match(content):
+            return True
+        return False
+
     async def _format_with_gemini(self, content: str) -> str:
         """
         Format content using Gemini AI
-        
+
         Args:
             content: Original content to format
-            
+
         Returns:
             Formatted content string
         """
         try:
+            # Trivial or already-tidy content is sent as-is - no model call
+            if self._should_skip_format(content):
+                if self.logger:
+                    self.logger.debug("Skipping Gemini formatting for trivial content")
+                return content
+
+            # Check the exact-match cache before paying the Gemini round trip
+            cache_key = _format_cache_key(content)
+            cached = _format_cache_get(cache_key)
+            if cached is not None:
+                if self.logger:
+                    self.logger.info("Gemini format cache hit for content digest %s", cache_key)
+                return cached
+
             if self.logger:
-                self.logger.info(f"Formatting content with Gemini: '{content[:100]}{'...' if len(content) > 100 else ''}'")
-            
-            prompt = f"Format the following content in a clear, professional, and well-structured way. Make it easy to read and understand:\n\n{content}"
-            
-            # Use the google-generativeai SDK
+                # %.100s truncates inside the logging module, so no slicing
+                # or temporary strings are built for filtered records
+                self.logger.info("Formatting content with Gemini: '%.100s%s'", content, "..." if len(content) > 100 else "")
+
+            # Route through the shared batcher, which coalesces concurrent
+            # requests into a single Gemini call (single requests go through
+            # unbatched). The formatting instruction lives in the model's
+            # system instruction, so the prompt is just the content itself.
             # Reference: https://ai.google.dev/gemini-api/docs/quickstart
-            model = genai.GenerativeModel("gemini-2.5-flash")
-            response = model.generate_content(prompt)
-            formatted_text = response.text
+            formatted_text = await _get_format_batcher(self._gemini_model).format(content)
             
             if self.logger:
-                self.logger.info(f"Gemini formatting completed: '{formatted_text[:100]}{'...' if len(formatted_text) > 100 else ''}'")
-            
+                self.logger.info("Gemini formatting completed: '%.100s%s'", formatted_text, "..." if len(formatted_text) > 100 else "")
+
+            _format_cache_put(cache_key, formatted_text)
             return formatted_text
         except Exception as e:
             if self.logger:
-                self.logger.error(f"Error formatting with Gemini: {str(e)}", exc_info=True)
+                self.logger.error("Error formatting with Gemini: %s", str(e), exc_info=True)
             # Return original content if Gemini fails
             return content
     
@@ -108,31 +469,25 @@ class AgenticService:
         Returns:
             Tuple of (country_code, phone_number) as strings
         """
-        # Remove all non-digit characters except +
-        cleaned = phone_number.replace(" ", "").replace("-", "").replace("(", "").replace(")", "")
-        
-        # Extract digits only
-        digits = ''.join(filter(str.isdigit, cleaned))
-        
-        # Common country codes (1-3 digits)
+        # Remove all non-digit characters except + (single C-level pass)
+        cleaned = phone_number.translate(_PHONE_STRIP_TABLE)
+
+        # Extract digits only (bytes.translate avoids the per-character
+        # Python call that filter(str.isdigit, ...) makes)
+        digits = phone_number.encode("ascii", "ignore").translate(None, _NON_DIGIT_BYTES).decode("ascii")
+
         # Try to extract country code (1-3 digits)
         if cleaned.startswith("+"):
             # Has + sign, try to extract country code
             # Common patterns: +1 (US), +91 (India), +44 (UK), etc.
             if digits.startswith("1") and len(digits) == 11:
                 return ("1", digits[1:])
-            elif digits.startswith("91") and len(digits) >= 10:
-                return ("91", digits[2:])
             elif len(digits) >= 10:
-                # Try 2-digit country code (most common)
-                if digits.startswith(("44", "49", "33", "39", "34", "31", "32", "41", "43", "45", "46", "47", "48")):
-                    return (digits[:2], digits[2:])
-                # Try 1-digit country code
-                elif digits.startswith(("1", "7")):
-                    return (digits[:1], digits[1:])
-                # Try 3-digit country code
-                elif digits.startswith(("880", "966", "971", "974", "961", "962", "965", "968")):
-                    return (digits[:3], digits[3:])
+                # Longest-match-wins lookup against the known dial codes
+                for code_len in (3, 2, 1):
+                    code = digits[:code_len]
+                    if code in _COUNTRY_CODES:
+                        return (code, digits[code_len:])
         
         # Default: assume no country code, use first digits as country code
         # For India (91), if number starts with 9 and is 10 digits, assume country code 91
@@ -144,72 +499,97 @@ class AgenticService:
         # Fallback: return as-is with empty country code
         return ("", digits)
     
-    async def _send_whatsapp_message(self, receiver: str, message: str, preview_url: bool = False) -> bool:
+    def _prepare_whatsapp_payload(self, receiver: str) -> dict:
         """
-        Send WhatsApp message to receiver using WbizTool API
+        Validate WbizTool credentials and build the send payload (without 'msg')
         Reference: https://wbiztool.com/docs/
-        
+
         Args:
             receiver: WhatsApp phone number (with country code, e.g., +1234567890)
-            message: Message content to send
-            preview_url: Not used in WbizTool API (kept for compatibility)
-            
+
         Returns:
-            True if message sent successfully, False otherwise
+            Payload dict ready for 'msg' to be filled in, or None if the
+            WbizTool credentials are not configured
         """
-        try:
-            if not self.wbiztool_client_id:
-                if self.logger:
-                    self.logger.warning("WBIZTOOL_CLIENT_ID not configured, skipping WhatsApp send")
-                return False
-            
-            if not self.wbiztool_api_key:
-                if self.logger:
-                    self.logger.warning("WBIZTOOL_API_KEY not configured, skipping WhatsApp send")
-                return False
-            
-            if not self.wbiztool_whatsapp_client:
-                if self.logger:
-                    self.logger.warning("WBIZTOOL_WHATSAPP_CLIENT not configured, skipping WhatsApp send")
-                return False
-            
-            # Extract country code and phone number
-            country_code, phone = self._extract_country_code_and_phone(receiver)
-            
+        if self._wbiztool_client_id_int is None:
             if self.logger:
-                self.logger.info(f"Sending WhatsApp message to {phone} (country code: {country_code}, original: {receiver})")
-            
-            # WbizTool API payload format
-            # Reference: https://wbiztool.com/docs/send-message-api/
-            # Required fields: client_id, api_key, whatsapp_client, phone, country_code, msg, msg_type
-            payload = {
-                "client_id": int(self.wbiztool_client_id),
-                "api_key": self.wbiztool_api_key,
-                "whatsapp_client": int(self.wbiztool_whatsapp_client),
-                "phone": phone,
-                "country_code": country_code,
-                "msg": message,
-                "msg_type": 0  # 0 for text message
-            }
-            
+                self.logger.warning("WBIZTOOL_CLIENT_ID not configured, skipping WhatsApp send")
+            return None
+
+        if not self.wbiztool_api_key:
             if self.logger:
-                self.logger.debug(f"Sending WbizTool request to {self.wbiztool_api_url}")
+                self.logger.warning("WBIZTOOL_API_KEY not configured, skipping WhatsApp send")
+            return None
+
+        if self._wbiztool_whatsapp_client_int is None:
+            if self.logger:
+                self.logger.warning("WBIZTOOL_WHATSAPP_CLIENT not configured, skipping WhatsApp send")
+            return None
+
+        # Extract country code and phone number
+        country_code, phone = self._extract_country_code_and_phone(receiver)
+
+        if self.logger:
+            self.logger.info("Sending WhatsApp message to %s (country code: %s, original: %s)", phone, country_code, receiver)
+
+        # WbizTool API payload format
+        # Reference: https://wbiztool.com/docs/send-message-api/
+        # Required fields: client_id, api_key, whatsapp_client, phone, country_code, msg, msg_type
+        payload = self._payload_template.copy()
+        payload["phone"] = phone
+        payload["country_code"] = country_code
+        return payload
+
+    @staticmethod
+    def _error_body_preview(response) -> str:
+        """Decode at most 4 KB of a response body for error logging"""
+        return response.content[:4096].decode("utf-8", "replace")
+
+    async def _post_whatsapp(self, payload: dict) -> bool:
+        """
+        POST a prepared payload to the WbizTool API
+
+        Args:
+            payload: Complete payload from _prepare_whatsapp_payload with 'msg' set
+
+        Returns:
+            True if message sent successfully, False otherwise
+        """
+        try:
+            # Only build the redacted payload dump when debug logging is
+            # actually enabled - it allocates a dict and serializes per send
+            if self.logger and self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("Sending WbizTool request to %s", self.wbiztool_api_url)
                 # Don't log full payload with API key for security
                 debug_payload = {k: v if k != "api_key" else "***" for k, v in payload.items()}
-                self.logger.debug(f"Payload: {json.dumps(debug_payload, indent=2)}")
+                self.logger.debug("Payload: %s", orjson.dumps(debug_payload, option=orjson.OPT_INDENT_2).decode())
             
-            # Send request using requests library (form data, not JSON)
-            # WbizTool API expects form data
-            response = requests.post(
-                self.wbiztool_api_url,
-                data=payload,
-                timeout=30
-            )
+            # Send request using the shared async client (form data, not JSON)
+            # WbizTool API expects form data. Gateway errors are retried with
+            # exponential backoff on the same keep-alive connection.
+            for attempt in range(_RETRY_TOTAL + 1):
+                response = await get_async_client().post(
+                    self.wbiztool_api_url,
+                    data=payload
+                )
+                if response.status_code not in _RETRY_STATUS_CODES or attempt == _RETRY_TOTAL:
+                    break
+                delay = _RETRY_BACKOFF_SECONDS * (2 ** attempt)
+                if self.logger:
+                    self.logger.warning("WbizTool returned %s, retrying in %.1fs (attempt %d/%d)",
+                                        response.status_code, delay, attempt + 1, _RETRY_TOTAL)
+                await asyncio.sleep(delay)
             
             # Check response status
             if response.status_code == 200:
+                # Sanity-cap the body; a well-formed WbizTool response is tiny
+                if int(response.headers.get("content-length", 0)) > 1_000_000:
+                    if self.logger:
+                        self.logger.error("WbizTool response unexpectedly large (%s bytes), ignoring",
+                                          response.headers["content-length"])
+                    return False
                 try:
-                    response_data = response.json()
+                    response_data = orjson.loads(response.content)
                     # Handle status as string or integer
                     status_value = response_data.get("status", "")
                     if isinstance(status_value, int):
@@ -220,43 +600,70 @@ class AgenticService:
                     # Check for success (status can be "success", "1", 1, or message_id present)
                     if status == "success" or status == "1" or response_data.get("message_id"):
                         if self.logger:
-                            self.logger.info(f"WhatsApp message sent successfully to {phone}")
+                            self.logger.info("WhatsApp message sent successfully to %s", payload["phone"])
                             if "message_id" in response_data:
-                                self.logger.debug(f"WbizTool message ID: {response_data['message_id']}")
-                            self.logger.debug(f"WbizTool API response: {response_data}")
+                                self.logger.debug("WbizTool message ID: %s", response_data["message_id"])
+                            self.logger.debug("WbizTool API response: %s", response_data)
                         return True
                     else:
                         # API returned 200 but with error status
                         error_message = response_data.get("message", "Unknown error")
                         if self.logger:
-                            self.logger.error(f"WbizTool API error: {error_message}")
-                            self.logger.debug(f"Full response: {response_data}")
+                            self.logger.error("WbizTool API error: %s", error_message)
+                            self.logger.debug("Full response: %s", response_data)
                         return False
-                except json.JSONDecodeError:
+                except orjson.JSONDecodeError:
                     if self.logger:
-                        self.logger.error(f"Failed to parse JSON response: {response.text}")
+                        self.logger.error("Failed to parse JSON response: %s", self._error_body_preview(response))
                     return False
             else:
-                # HTTP error
+                # HTTP error - only decode enough of the body to extract the
+                # error message; rate-limit notices and HTML error walls can
+                # be arbitrarily large
                 try:
-                    error_data = response.json()
+                    error_data = orjson.loads(response.content)
                     error_message = error_data.get("message", f"HTTP {response.status_code}")
                     if self.logger:
-                        self.logger.error(f"WbizTool API error [{response.status_code}]: {error_message}")
-                except:
+                        self.logger.error("WbizTool API error [%s]: %s", response.status_code, error_message)
+                except (orjson.JSONDecodeError, ValueError, AttributeError):
                     if self.logger:
-                        self.logger.error(f"WbizTool API error: {response.status_code} - {response.text}")
+                        self.logger.error("WbizTool API error: %s - %s", response.status_code,
+                                          self._error_body_preview(response))
                 return False
                 
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             if self.logger:
-                self.logger.error(f"Network error sending WhatsApp message: {str(e)}", exc_info=True)
+                self.logger.error("Network error sending WhatsApp message: %s", str(e), exc_info=True)
             return False
         except Exception as e:
             if self.logger:
-                self.logger.error(f"Error sending WhatsApp message: {str(e)}", exc_info=True)
+                self.logger.error("Error sending WhatsApp message: %s", str(e), exc_info=True)
             return False
-    
+
+    async def _send_whatsapp_message(self, receiver: str, message: str, preview_url: bool = False) -> bool:
+        """
+        Send WhatsApp message to receiver using WbizTool API
+        Reference: https://wbiztool.com/docs/
+
+        Args:
+            receiver: WhatsApp phone number (with country code, e.g., +1234567890)
+            message: Message content to send
+            preview_url: Not used in WbizTool API (kept for compatibility)
+
+        Returns:
+            True if message sent successfully, False otherwise
+        """
+        try:
+            payload = self._prepare_whatsapp_payload(receiver)
+        except Exception as e:
+            if self.logger:
+                self.logger.error("Error preparing WhatsApp payload: %s", str(e), exc_info=True)
+            return False
+        if payload is None:
+            return False
+        payload["msg"] = message
+        return await self._post_whatsapp(payload)
+
     async def execute_task(self, input_data: dict) -> ServiceResult:
         """
         Execute WhatsApp agent task
@@ -279,19 +686,65 @@ class AgenticService:
             if self.logger:
                 self.logger.error("Content parameter is missing")
             raise ValueError("Content parameter is required")
-        
+
+        if len(content) > MAX_WHATSAPP_LEN:
+            if self.logger:
+                self.logger.error("Content length %d exceeds WhatsApp limit of %d", len(content), MAX_WHATSAPP_LEN)
+            raise ValueError(f"Content exceeds the WhatsApp message limit of {MAX_WHATSAPP_LEN} characters")
+
         if self.logger:
-            self.logger.info(f"Processing WhatsApp agent task for receiver: {receiver}")
-        
-        # Format content with Gemini
-        formatted_content = await self._format_with_gemini(content)
-        
-        # Send formatted message via WhatsApp
-        sent = await self._send_whatsapp_message(receiver, formatted_content)
-        
+            self.logger.info("Processing WhatsApp agent task for receiver: %s", receiver)
+
+        # Collapse concurrent duplicates: if an identical task is already in
+        # flight, await its result instead of issuing a second Gemini call
+        # and a second WhatsApp send (shielded so one waiter's cancellation
+        # doesn't break the others)
+        key = _inflight_key(receiver, content)
+        existing = _INFLIGHT_TASKS.get(key)
+        if existing is not None:
+            if self.logger:
+                self.logger.info("Duplicate task already in flight for receiver %s, awaiting shared result", receiver)
+            formatted_content, sent = await asyncio.shield(existing)
+            return ServiceResult(receiver, content, formatted_content, sent)
+
+        future = asyncio.get_running_loop().create_future()
+        _INFLIGHT_TASKS[key] = future
+        try:
+            # Format content with Gemini while preparing the WhatsApp payload
+            # (credential checks and country-code extraction don't depend on
+            # the formatted text, so they can overlap the Gemini round trip)
+            formatted_content, payload = await asyncio.gather(
+                self._format_with_gemini(content),
+                asyncio.to_thread(self._prepare_whatsapp_payload, receiver),
+                return_exceptions=True
+            )
+            if isinstance(formatted_content, BaseException):
+                raise formatted_content
+            if isinstance(payload, BaseException):
+                if self.logger:
+                    self.logger.error("Error preparing WhatsApp payload: %s", str(payload), exc_info=payload)
+                payload = None
+
+            # Send formatted message via WhatsApp
+            if payload is not None:
+                payload["msg"] = formatted_content
+                sent = await self._post_whatsapp(payload)
+            else:
+                sent = False
+        except BaseException as e:
+            if not future.done():
+                future.set_exception(e)
+                # Mark the exception retrieved in case no waiter picked it up
+                future.exception()
+            raise
+        finally:
+            _INFLIGHT_TASKS.pop(key, None)
+        if not future.done():
+            future.set_result((formatted_content, sent))
+
         if self.logger:
-            self.logger.info(f"WhatsApp agent task completed. Sent: {sent}")
-        
+            self.logger.info("WhatsApp agent task completed. Sent: %s", sent)
+
         return ServiceResult(receiver, content, formatted_content, sent)
 
 def get_agentic_service(logger=None):
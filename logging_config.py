@@ -1,17 +1,44 @@
 import os
+import atexit
+import queue
 import logging
-from logging.handlers import RotatingFileHandler
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
+
+# Keep a reference to the running QueueListener so it isn't garbage
+# collected and can be stopped cleanly at interpreter exit
+_queue_listener = None
+
+def _stop_queue_listener():
+    """
+    Stop the active QueueListener if one is running
+
+    Idempotent (QueueListener.stop itself is not), so it's safe both as
+    the atexit hook and when setup_logging replaces an earlier listener.
+    """
+    global _queue_listener
+    listener, _queue_listener = _queue_listener, None
+    if listener is not None:
+        listener.stop()
+
+# Registered once at import - repeated setup_logging calls must not stack
+# atexit callbacks, or interpreter exit stops the same listener twice
+atexit.register(_stop_queue_listener)
 
 def setup_logging(log_level=logging.INFO):
     """
     Configure application-wide logging
-    
+
+    Handlers run behind a QueueHandler/QueueListener pair, so expensive
+    record handling (formatting, traceback rendering for exc_info logs,
+    file I/O) happens on a background thread instead of the request path.
+
     Args:
         log_level: The minimum log level to capture (default: INFO)
-    
+
     Returns:
         logger: Configured logger instance
     """
+    global _queue_listener
     # Create logs directory if it doesn't exist
     log_directory = "logs"
     os.makedirs(log_directory, exist_ok=True)
@@ -34,12 +61,18 @@ def setup_logging(log_level=logging.INFO):
     
     # Remove any existing handlers to prevent duplicates
     for handler in root_logger.handlers[:]:
-        if isinstance(handler, logging.StreamHandler):
+        if isinstance(handler, (logging.StreamHandler, QueueHandler)):
             root_logger.removeHandler(handler)
-    
-    # Add the file handler
-    root_logger.addHandler(file_handler)
-    
+
+    # Route records through a queue: the caller only enqueues, and the
+    # listener thread does the formatting and file writes
+    log_queue = queue.SimpleQueue()
+    root_logger.addHandler(QueueHandler(log_queue))
+
+    _stop_queue_listener()
+    _queue_listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+    _queue_listener.start()
+
     return root_logger
 
 def get_logger(name):
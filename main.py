@@ -8,7 +8,7 @@ from pydantic import BaseModel, Field, field_validator
 from masumi.config import Config
 from masumi.payment import Payment, Amount
 from logging_config import setup_logging
-from agent import AgenticService
+from agent import AgenticService, close_async_client
 
 
 # Configure logging
@@ -47,6 +47,11 @@ config = Config(
     payment_api_key=PAYMENT_API_KEY
 )
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """ Close the shared WbizTool HTTP client on server shutdown """
+    await close_async_client()
+
 # ─────────────────────────────────────────────────────────────────────────────
 # Pydantic Models
 # ─────────────────────────────────────────────────────────────────────────────
@@ -20,8 +20,10 @@ Steps this script performs:
 5. Shows the WhatsApp message formatting and delivery after payment confirmation"""
 
 import os
+import sys
 import json
 import time
+import random
 import asyncio
 import requests
 from datetime import datetime
@@ -30,36 +32,53 @@ from dotenv import load_dotenv
 load_dotenv()
 
 # Colors for terminal output
+# Disabled when NO_COLOR is set (https://no-color.org/) so piped/CI output
+# isn't littered with ANSI escape codes
 class Colors:
-    HEADER = '\033[95m'
-    BLUE = '\033[94m'
-    CYAN = '\033[96m'
-    GREEN = '\033[92m'
-    YELLOW = '\033[93m'
-    RED = '\033[91m'
-    END = '\033[0m'
-    BOLD = '\033[1m'
+    if os.getenv("NO_COLOR"):
+        HEADER = BLUE = CYAN = GREEN = YELLOW = RED = END = BOLD = ''
+    else:
+        HEADER = '\033[95m'
+        BLUE = '\033[94m'
+        CYAN = '\033[96m'
+        GREEN = '\033[92m'
+        YELLOW = '\033[93m'
+        RED = '\033[91m'
+        END = '\033[0m'
+        BOLD = '\033[1m'
+
+# Prefixes and bars assembled once at import so each helper below issues a
+# single stdout write instead of several small print() calls
+_HEADER_RULE = '=' * 70
+_HEADER_BAR = f"{Colors.BOLD}{Colors.BLUE}{_HEADER_RULE}"
+_SUCCESS_PREFIX = f"{Colors.GREEN}✓ "
+_INFO_PREFIX = f"{Colors.CYAN}ℹ "
+_WARNING_PREFIX = f"{Colors.YELLOW}⚠ "
+_ERROR_PREFIX = f"{Colors.RED}✗ "
 
 def print_header(text):
-    print(f"\n{Colors.BOLD}{Colors.BLUE}{'='*70}")
-    print(f"{text}")
-    print(f"{'='*70}{Colors.END}\n")
+    sys.stdout.write(f"\n{_HEADER_BAR}\n{text}\n{_HEADER_RULE}{Colors.END}\n\n")
 
 def print_success(text):
-    print(f"{Colors.GREEN}✓ {text}{Colors.END}")
+    sys.stdout.write(f"{_SUCCESS_PREFIX}{text}{Colors.END}\n")
 
 def print_info(text):
-    print(f"{Colors.CYAN}ℹ {text}{Colors.END}")
+    sys.stdout.write(f"{_INFO_PREFIX}{text}{Colors.END}\n")
 
 def print_warning(text):
-    print(f"{Colors.YELLOW}⚠ {text}{Colors.END}")
+    sys.stdout.write(f"{_WARNING_PREFIX}{text}{Colors.END}\n")
 
 def print_error(text):
-    print(f"{Colors.RED}✗ {text}{Colors.END}")
+    sys.stdout.write(f"{_ERROR_PREFIX}{text}{Colors.END}\n")
 
 async def main():
     """Main test function"""
-    
+
+    # One session for every HTTP call in the test - keep-alive means only
+    # the first request pays the TCP(+TLS) handshake, which matters when
+    # the status loop polls the agent for minutes
+    session = requests.Session()
+
     print(f"\n{Colors.BOLD}{Colors.HEADER}")
     print("╔══════════════════════════════════════════════════════════════════════╗")
     print("║                                                                      ║")
@@ -125,7 +144,7 @@ async def main():
     # Step 1: Check service availability
     print_header("Step 1: Checking Service Availability")
     try:
-        response = requests.get(f"{AGENT_URL}/availability", timeout=10)
+        response = session.get(f"{AGENT_URL}/availability", timeout=10)
         response.raise_for_status()
         print_success("WhatsApp AI Agent is online and ready!")
     except Exception as e:
@@ -154,7 +173,7 @@ async def main():
     print_info(f"Content preview: '{content[:50]}...'")
     
     try:
-        response = requests.post(f"{AGENT_URL}/start_job", json=payload, timeout=30)
+        response = session.post(f"{AGENT_URL}/start_job", json=payload, timeout=30)
         response.raise_for_status()
         job_data = response.json()
         
@@ -199,7 +218,7 @@ async def main():
     print_info(f"Paying {amount_ada} ADA to smart contract...")
     
     try:
-        response = requests.post(
+        response = session.post(
             f"{PAYMENT_SERVICE_URL}/purchase",
             json=payment_details,
             headers={
@@ -253,10 +272,16 @@ async def main():
     max_wait = 300  # 5 minutes max
     start_time = time.time()
     last_status = None
-    
+    poll_count = 0
+
+    # Poll with exponential backoff + jitter: quick re-checks right after a
+    # state change (when completion is most likely), easing off to 5s
+    def poll_delay(count):
+        return min(5.0, 0.5 * (1.5 ** count)) + random.uniform(0, 0.25)
+
     while (time.time() - start_time) < max_wait:
         try:
-            response = requests.get(
+            response = session.get(
                 f"{AGENT_URL}/status",
                 params={"job_id": job_id},
                 timeout=10
@@ -272,6 +297,7 @@ async def main():
                 print(f"[{elapsed}s] Job: {Colors.YELLOW}{job_status}{Colors.END} | "
                       f"Payment: {Colors.YELLOW}{payment_status}{Colors.END}")
                 last_status = job_status
+                poll_count = 0  # state changed - start polling quickly again
             
             if job_status == "completed":
                 print()
@@ -289,11 +315,13 @@ async def main():
                 print(json.dumps(status_data, indent=2))
                 break
             
-            await asyncio.sleep(5)
-            
+            await asyncio.sleep(poll_delay(poll_count))
+            poll_count += 1
+
         except Exception as e:
             print_error(f"Status check error: {e}")
-            await asyncio.sleep(5)
+            await asyncio.sleep(poll_delay(poll_count))
+            poll_count += 1
     
     # Step 5: Summary
     print_header("Transaction Summary")